@@ -1,13 +1,12 @@
 import os
-from typing import TypedDict, List, Annotated
-import operator
+from typing import TypedDict
 
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langgraph.graph import StateGraph, END
 
 from main import build_llm
 from tools import read_resume_file, generate_resume_pdf
+from blob_store import put_text, load_text
 
 # -------------------------------------------------------------------------
 # Default Resume Template
@@ -49,17 +48,18 @@ DEFAULT_RESUME_TEMPLATE = """
 class AgentState(TypedDict):
     """
     The state of the agent, acting as its short-term memory across the workflow.
+    Large text fields are kept in the blob store; the state only carries their references (`*_ref`),
+    which are resolved lazily with `blob_store.load_text`.
     """
     resume_file_path: str
     user_requirements: str  # User's additional requirements
-    template_content: str   # Resume format template (User provided or Default)
-    original_content: str
-    analysis_report: str
-    optimization_plan: str
-    optimized_content: str
+    template_content_ref: str   # Resume format template (User provided or Default)
+    original_content_ref: str
+    base_analysis_ref: str  # Requirements-independent analysis (may be pre-computed speculatively)
+    analysis_report_ref: str
+    optimization_plan_ref: str
+    optimized_content_ref: str
     pdf_output_path: str
-    # Keep track of conversation history if needed (optional for this linear flow)
-    messages: Annotated[List[BaseMessage], operator.add]
 
 # -------------------------------------------------------------------------
 # 2. Nodes Implementation (Perception, Processing, Planning, Action)
@@ -70,54 +70,95 @@ def perception_node(state: AgentState):
     Perception Module: Gathers information from the environment (resume file).
     """
     print("--- [Step 1] Perception: Reading Resume File ---")
+    if state.get('original_content_ref'):
+        # Text was already extracted by the speculative pre-analysis.
+        print("Reusing pre-extracted resume content.")
+        return {"original_content_ref": state['original_content_ref']}
+
     file_path = state['resume_file_path']
     content = read_resume_file(file_path)
     
     if content.startswith("Error"):
         # In a real agent, we might raise an error or ask for input again.
         print(f"Failed to read file: {content}")
-        return {"original_content": ""}
+        return {"original_content_ref": ""}
         
-    return {"original_content": content}
+    return {"original_content_ref": put_text(content)}
+
+BASE_ANALYSIS_SYSTEM_PROMPT = "你是一个资深的HR和简历专家。请详细分析以下简历内容的优缺点，指出格式、内容、用词等方面的问题。"
+
+def run_base_analysis(content: str) -> str:
+    """
+    Runs the requirements-independent part of the analysis.
+    It only depends on the resume text, so it can start before the user has typed any requirements.
+    """
+    llm = build_llm()
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", BASE_ANALYSIS_SYSTEM_PROMPT),
+        ("user", "{user_msg}")
+    ])
+    chain = prompt | llm
+    response = chain.invoke({"user_msg": f"简历内容：\n{content}"})
+
+    return response.content
 
 def analysis_node(state: AgentState):
     """
     Processing Module (Part 1): Analyzes the input data to understand current status.
     """
     print("--- [Step 2] Processing: Analyzing Resume ---")
-    content = state['original_content']
+    content = load_text(state['original_content_ref'])
     requirements = state.get('user_requirements', '')
+    base_report = load_text(state.get('base_analysis_ref', ''))
     
     if not content:
-        return {"analysis_report": "No content to analyze."}
+        return {"analysis_report_ref": put_text("No content to analyze.")}
+
+    if base_report:
+        # A base analysis is already available, only the requirement-specific delta is missing.
+        print("Reusing pre-computed base analysis.")
+        if not requirements:
+            return {"analysis_report_ref": state['base_analysis_ref']}
+
+        llm = build_llm()
+
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "你是一个资深的HR和简历专家。下面给出了简历内容和一份已完成的通用分析报告，请结合用户的附加要求进行补充分析。不要重复通用报告中已有的内容，只输出针对附加要求的分析。"),
+            ("user", "简历内容：\n{content}\n\n通用分析报告：\n{base_report}\n\n用户附加要求：\n{requirements}")
+        ])
+        chain = prompt | llm
+        response = chain.invoke({"content": content, "base_report": base_report, "requirements": requirements})
+
+        return {"analysis_report_ref": put_text(f"{base_report}\n\n## 针对附加要求的补充分析\n\n{response.content}")}
+
+    if not requirements:
+        return {"analysis_report_ref": put_text(run_base_analysis(content))}
     
     llm = build_llm()
     
-    system_prompt = "你是一个资深的HR和简历专家。请详细分析以下简历内容的优缺点，指出格式、内容、用词等方面的问题。"
     user_msg = f"简历内容：\n{content}"
-    
-    if requirements:
-        user_msg += f"\n\n用户附加要求：\n{requirements}\n请重点结合用户的附加要求进行分析。"
+    user_msg += f"\n\n用户附加要求：\n{requirements}\n请重点结合用户的附加要求进行分析。"
 
     prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
+        ("system", BASE_ANALYSIS_SYSTEM_PROMPT),
         ("user", "{user_msg}")
     ])
     chain = prompt | llm
     response = chain.invoke({"user_msg": user_msg})
     
-    return {"analysis_report": response.content}
+    return {"analysis_report_ref": put_text(response.content)}
 
 def planning_node(state: AgentState):
     """
     Planning Module: Decides on a plan of action based on the analysis.
     """
     print("--- [Step 3] Planning: Creating Optimization Plan ---")
-    analysis = state['analysis_report']
+    analysis = load_text(state['analysis_report_ref'])
     requirements = state.get('user_requirements', '')
     
     if not analysis:
-        return {"optimization_plan": "No analysis available."}
+        return {"optimization_plan_ref": put_text("No analysis available.")}
 
     llm = build_llm()
     
@@ -132,24 +173,24 @@ def planning_node(state: AgentState):
     chain = prompt | llm
     response = chain.invoke({"user_msg": user_msg})
     
-    return {"optimization_plan": response.content}
+    return {"optimization_plan_ref": put_text(response.content)}
 
 def execution_node(state: AgentState):
     """
     Processing Module (Part 2): Executes the plan (Rewriting the resume).
     """
     print("--- [Step 4] Processing: Rewriting Resume ---")
-    original = state['original_content']
-    plan = state['optimization_plan']
+    original = load_text(state['original_content_ref'])
+    plan = load_text(state['optimization_plan_ref'])
     requirements = state.get('user_requirements', '')
-    template = state.get('template_content', '')
+    template = load_text(state.get('template_content_ref', ''))
 
     if not template:
         print("No template provided, using default template.")
         template = DEFAULT_RESUME_TEMPLATE
     
     if not original:
-        return {"optimized_content": "Cannot rewrite empty resume."}
+        return {"optimized_content_ref": put_text("Cannot rewrite empty resume.")}
 
     llm = build_llm()
     
@@ -172,14 +213,14 @@ def execution_node(state: AgentState):
     print(response.content)
     print("="*20 + " LLM RAW OUTPUT END " + "="*20 + "\n")
 
-    return {"optimized_content": response.content}
+    return {"optimized_content_ref": put_text(response.content)}
 
 def action_node(state: AgentState):
     """
     Action Module: Performs the final action (Generating PDF).
     """
     print("--- [Step 5] Action: Generating PDF ---")
-    optimized_text = state['optimized_content']
+    optimized_text = load_text(state['optimized_content_ref'])
     
     # Ensure output directory exists
     output_dir = "output"
@@ -251,7 +292,6 @@ if __name__ == "__main__":
     initial_state = {
         "resume_file_path": test_resume_path,
         "user_requirements": "希望强调我的Java后端开发能力，并且语气更正式一些。",
-        "messages": []
     }
     
     print("Starting Resume Agent...")
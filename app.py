@@ -1,10 +1,21 @@
 import streamlit as st
 import os
 import time
+import uuid
 from agent_demo import build_resume_agent
+from blob_store import put_text, load_text
+from speculation import start_pre_analysis, get_pre_analysis
+import session_store
 
 st.set_page_config(page_title="AI 简历优化助手", page_icon="📄")
 
+# Results live in the process-wide session store (as blob references), st.session_state only keeps the id
+if 'session_id' not in st.session_state:
+    st.session_state['session_id'] = uuid.uuid4().hex
+session_id = st.session_state['session_id']
+session_store.touch(session_id)
+session_store.evict_idle()
+
 st.title("📄 AI 简历优化助手")
 st.markdown("上传您的简历（PDF/TXT），AI 将为您进行深度分析与优化，并生成全新的 PDF 简历。")
 
@@ -12,6 +23,17 @@ st.markdown("上传您的简历（PDF/TXT），AI 将为您进行深度分析与
 with st.sidebar:
     st.header("配置")
     uploaded_file = st.file_uploader("1. 上传简历文件", type=["pdf", "txt", "md"])
+
+    speculative_mode = st.checkbox(
+        "上传后立即后台预分析",
+        value=False,
+        help="在您填写附加要求的同时，提前完成简历解析与通用分析，点击“开始优化”后只需补充针对要求的分析。"
+    )
+    if uploaded_file and speculative_mode:
+        # Kick off (or reuse) the background pre-analysis for this file
+        st.session_state['pre_analysis_key'] = start_pre_analysis(uploaded_file.getvalue(), uploaded_file.name)
+    else:
+        st.session_state.pop('pre_analysis_key', None)
     
     st.markdown("---")
     
@@ -26,8 +48,8 @@ with st.sidebar:
     if st.button("开始优化", type="primary"):
         st.session_state['start_btn_clicked'] = True
         # Clear previous results to force re-run
-        if 'final_state' in st.session_state:
-            del st.session_state['final_state']
+        session_store.clear_result(session_id)
+        st.session_state['has_result'] = False
 
 # Main area
 if not uploaded_file and not st.session_state.get('start_btn_clicked', False):
@@ -49,26 +71,29 @@ if st.session_state.get('start_btn_clicked', False):
             
         st.info(f"文件已接收：{uploaded_file.name}")
         
-        # Handle template file
-        template_content = ""
-        if template_file:
+        # Check if we already have results
+        final_state = session_store.get_result(session_id)
+        if final_state:
             try:
-                # Assuming text/markdown template
-                template_content = template_file.getvalue().decode("utf-8")
-                st.info(f"已加载自定义模板：{template_file.name}")
-            except Exception as e:
-                st.warning(f"模板文件读取失败，将使用默认模板。错误：{e}")
+                optimized_content = load_text(final_state.get("optimized_content_ref"))
+                analysis_report = load_text(final_state.get("analysis_report_ref"))
+            except FileNotFoundError:
+                # Blobs were evicted, treat the result as expired
+                session_store.clear_result(session_id)
+                final_state = None
 
-        # Check if we already have results
-        if 'final_state' in st.session_state:
-            final_state = st.session_state['final_state']
+        if not final_state and st.session_state.get('has_result', False):
+            # The result was evicted while idle; never silently re-run the whole pipeline
+            st.session_state['start_btn_clicked'] = False
+            st.session_state['has_result'] = False
+            st.warning("结果已过期，请重新点击开始优化")
+
+        elif final_state:
             
             # Show completion status immediately
             st.success("简历优化成功！（已加载缓存结果）")
             
             pdf_path = final_state.get("pdf_output_path")
-            optimized_content = final_state.get("optimized_content")
-            analysis_report = final_state.get("analysis_report")
             
             # Display results
             col1, col2 = st.columns(2)
@@ -101,6 +126,16 @@ if st.session_state.get('start_btn_clicked', False):
                 st.error("PDF 生成失败，请检查日志。")
 
         else:
+            # Handle template file
+            template_content_ref = ""
+            if template_file:
+                try:
+                    # Assuming text/markdown template
+                    template_content_ref = put_text(template_file.getvalue().decode("utf-8"))
+                    st.info(f"已加载自定义模板：{template_file.name}")
+                except Exception as e:
+                    st.warning(f"模板文件读取失败，将使用默认模板。错误：{e}")
+
             try:
                 # Build Agent
                 agent = build_resume_agent()
@@ -109,9 +144,14 @@ if st.session_state.get('start_btn_clicked', False):
                 initial_state = {
                     "resume_file_path": file_path,
                     "user_requirements": user_requirements,
-                    "template_content": template_content,
-                    "messages": []
+                    "template_content_ref": template_content_ref,
                 }
+
+                # Reuse the speculative pre-analysis if one was started for this file
+                pre_analysis_key = st.session_state.get('pre_analysis_key')
+                if pre_analysis_key:
+                    with st.spinner("正在等待后台预分析结果..."):
+                        initial_state.update(get_pre_analysis(pre_analysis_key))
                 
                 # Initialize final_state
                 final_state = initial_state.copy()
@@ -126,26 +166,34 @@ if st.session_state.get('start_btn_clicked', False):
                             final_state.update(node_state)
                             
                             if node_name == "perception":
-                                st.write("👀 **[感知]** 已读取并解析简历文件")
+                                if initial_state.get("original_content_ref"):
+                                    st.write("👀 **[感知]** 已复用后台预解析的简历内容")
+                                else:
+                                    st.write("👀 **[感知]** 已读取并解析简历文件")
                                 status.update(label="正在进行深度分析...", state="running")
                                 
                             elif node_name == "analysis":
-                                st.write("🧠 **[分析]** 完成简历诊断与评估")
+                                if initial_state.get("base_analysis_ref") and user_requirements:
+                                    st.write("🧠 **[分析]** 已复用后台预分析，并补充针对附加要求的诊断")
+                                elif initial_state.get("base_analysis_ref"):
+                                    st.write("🧠 **[分析]** 已复用后台预分析结果")
+                                else:
+                                    st.write("🧠 **[分析]** 完成简历诊断与评估")
                                 # Show a snippet of analysis
-                                if "analysis_report" in node_state:
+                                if "analysis_report_ref" in node_state:
                                     with st.expander("查看分析摘要"):
-                                        st.markdown(node_state["analysis_report"][:500] + "...")
+                                        st.markdown(load_text(node_state["analysis_report_ref"])[:500] + "...")
                                 status.update(label="正在制定优化策略...", state="running")
                                 
                             elif node_name == "planning":
                                 st.write("📝 **[规划]** 已生成针对性优化方案")
-                                if "optimization_plan" in node_state:
+                                if "optimization_plan_ref" in node_state:
                                     with st.expander("查看优化策略"):
-                                        st.markdown(node_state["optimization_plan"])
+                                        st.markdown(load_text(node_state["optimization_plan_ref"]))
                                 status.update(label="正在重写并应用模板...", state="running")
                                 
                             elif node_name == "execution":
-                                template_used = "自定义模板" if initial_state.get("template_content") else "默认通用模板"
+                                template_used = "自定义模板" if initial_state.get("template_content_ref") else "默认通用模板"
                                 st.write(f"✍️ **[执行]** 已选用 **{template_used}**，简历内容重写完成")
                                 status.update(label="正在生成 PDF 文件...", state="running")
                                 
@@ -154,12 +202,13 @@ if st.session_state.get('start_btn_clicked', False):
                     
                     status.update(label="🎉 简历优化完成！", state="complete", expanded=False)
                 
-                # Save result to session state
-                st.session_state['final_state'] = final_state
+                # Save result (blob references only) to the session store
+                session_store.set_result(session_id, final_state)
+                st.session_state['has_result'] = True
                 
                 pdf_path = final_state.get("pdf_output_path")
-                optimized_content = final_state.get("optimized_content")
-                analysis_report = final_state.get("analysis_report")
+                optimized_content = load_text(final_state.get("optimized_content_ref"))
+                analysis_report = load_text(final_state.get("analysis_report_ref"))
                 
                 st.success("简历优化成功！")
                 
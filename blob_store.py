@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+import time
+
+# -------------------------------------------------------------------------
+# Blob Store: content-addressed storage for large state fields
+# -------------------------------------------------------------------------
+# Large texts (resume content, reports, plans, optimized Markdown) are written
+# to disk once and referenced by their SHA-256 hash. The agent state and the
+# Streamlit session only carry these short references; the content is loaded
+# lazily when a node or the UI actually needs it.
+
+BLOB_DIR = os.getenv("BLOB_STORE_DIR", "blobs")
+REF_PREFIX = "blob:"
+
+# Serializes "refresh an existing blob" against the sweeper's "check and delete",
+# so a blob is never removed between being handed out and being touched.
+_lock = threading.Lock()
+
+
+def _blob_path(ref: str) -> str:
+    if not is_ref(ref):
+        raise ValueError(f"Invalid blob reference: {ref!r}")
+    return os.path.join(BLOB_DIR, ref[len(REF_PREFIX):])
+
+
+def is_ref(value) -> bool:
+    """Returns True if the value is a blob reference produced by this module."""
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+def touch(ref: str) -> bool:
+    """Refreshes a blob's access time so idle eviction keeps it around. Returns False if it is gone."""
+    with _lock:
+        try:
+            os.utime(_blob_path(ref))
+            return True
+        except FileNotFoundError:
+            return False
+
+
+def put_bytes(data: bytes) -> str:
+    """Stores raw bytes (deduplicated by content hash) and returns their reference."""
+    ref = REF_PREFIX + hashlib.sha256(data).hexdigest()
+    path = _blob_path(ref)
+
+    if touch(ref):
+        return ref
+
+    os.makedirs(BLOB_DIR, exist_ok=True)
+    # Write to a temp file first so concurrent readers never see a partial blob
+    tmp_path = f"{path}.{os.getpid()}.{time.time_ns()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    # A freshly replaced blob is newer than any sweep cutoff, so it is safe without the lock
+    os.replace(tmp_path, path)
+
+    return ref
+
+
+def get_bytes(ref: str) -> bytes:
+    """Loads the bytes behind a reference. Raises FileNotFoundError if the blob was evicted."""
+    path = _blob_path(ref)
+    with open(path, "rb") as f:
+        data = f.read()
+    touch(ref)
+    return data
+
+
+def put_text(text: str) -> str:
+    """Stores a string and returns its reference."""
+    return put_bytes(text.encode("utf-8"))
+
+
+def load_text(ref: str) -> str:
+    """Lazy loader for text fields; an empty reference loads as an empty string."""
+    if not ref:
+        return ""
+    return get_bytes(ref).decode("utf-8")
+
+
+def evict_idle_blobs(max_idle_seconds: float, keep=()) -> int:
+    """
+    Deletes blobs that have not been written or read for `max_idle_seconds`,
+    except those whose references are in `keep` (still held by a session or a pre-analysis result).
+    Returns the count removed.
+    """
+    if not os.path.isdir(BLOB_DIR):
+        return 0
+
+    keep_names = {ref[len(REF_PREFIX):] for ref in keep if is_ref(ref)}
+    cutoff = time.time() - max_idle_seconds
+    removed = 0
+    for name in os.listdir(BLOB_DIR):
+        if name in keep_names:
+            continue
+        path = os.path.join(BLOB_DIR, name)
+        with _lock:
+            try:
+                # Re-check under the lock: the blob may have been touched since listdir
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                # Already removed by another sweep
+                continue
+
+    return removed
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+
+import blob_store
+import speculation
+
+# -------------------------------------------------------------------------
+# Session Store: per-session results with idle eviction
+# -------------------------------------------------------------------------
+# Results are kept in a process-wide registry instead of `st.session_state`,
+# so that sessions which went idle (e.g. abandoned browser tabs) can be
+# reclaimed by any other session's run. Entries only hold blob references.
+
+SESSION_IDLE_SECONDS = int(os.getenv("SESSION_IDLE_SECONDS", "1800"))
+SWEEP_INTERVAL_SECONDS = 60
+
+_sessions: dict = {}  # session_id -> {"last_seen": float, "final_state": dict | None}
+_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def touch(session_id: str) -> None:
+    """Marks a session as active."""
+    with _lock:
+        entry = _sessions.setdefault(session_id, {"final_state": None})
+        entry["last_seen"] = time.time()
+
+
+def get_result(session_id: str):
+    """Returns the stored final state of a session, or None."""
+    with _lock:
+        entry = _sessions.get(session_id)
+        return entry["final_state"] if entry else None
+
+
+def set_result(session_id: str, final_state: dict) -> None:
+    with _lock:
+        _sessions[session_id] = {"last_seen": time.time(), "final_state": final_state}
+
+
+def clear_result(session_id: str) -> None:
+    with _lock:
+        entry = _sessions.get(session_id)
+        if entry:
+            entry["final_state"] = None
+
+
+def evict_idle() -> None:
+    """
+    Drops sessions idle for longer than SESSION_IDLE_SECONDS, together with stale
+    pre-analysis results and blobs no longer referenced by either.
+    Runs at most once per SWEEP_INTERVAL_SECONDS.
+    """
+    global _last_sweep
+
+    now = time.time()
+    with _lock:
+        if now - _last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        _last_sweep = now
+
+        cutoff = now - SESSION_IDLE_SECONDS
+        idle = [sid for sid, entry in _sessions.items() if entry["last_seen"] < cutoff]
+        for sid in idle:
+            del _sessions[sid]
+
+        # Blobs still referenced by a live session must survive, however long ago they were read
+        live_refs = {
+            value
+            for entry in _sessions.values() if entry["final_state"]
+            for value in entry["final_state"].values() if blob_store.is_ref(value)
+        }
+
+    removed_results = speculation.evict_idle(SESSION_IDLE_SECONDS)
+    live_refs |= speculation.live_refs()
+    removed_blobs = blob_store.evict_idle_blobs(SESSION_IDLE_SECONDS, keep=live_refs)
+    if idle or removed_results or removed_blobs:
+        print(f"Evicted {len(idle)} idle sessions, {removed_results} pre-analysis results, {removed_blobs} blobs.")
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from agent_demo import run_base_analysis
+from blob_store import put_text, touch
+from tools import read_resume_file
+
+# -------------------------------------------------------------------------
+# Speculative Pre-Analysis
+# -------------------------------------------------------------------------
+# Text extraction and the requirements-independent base analysis only depend
+# on the resume file, so they can run in the background while the user is
+# still typing the requirements. Results are keyed by the file's content hash
+# and only hold blob references, so cached entries stay small.
+
+MAX_CACHED_RESULTS = 32
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pre-analysis")
+_results: "OrderedDict[str, Future]" = OrderedDict()
+_last_used: dict = {}
+_lock = threading.Lock()
+
+
+def file_hash(data: bytes) -> str:
+    """Returns the SHA-256 hex digest used as the cache key for an uploaded file."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _pre_analyze(file_path: str) -> dict:
+    print(f"--- [Speculative] Pre-analyzing {file_path} ---")
+    try:
+        content = read_resume_file(file_path)
+    finally:
+        # The speculative copy is only needed for text extraction
+        os.remove(file_path)
+
+    if content.startswith("Error"):
+        print(f"Failed to read file: {content}")
+        return {}
+
+    # Keep the extracted text even if the base analysis fails; the graph then only re-runs the analysis
+    result = {"original_content_ref": put_text(content)}
+    try:
+        result["base_analysis_ref"] = put_text(run_base_analysis(content))
+    except Exception as e:
+        print(f"Speculative base analysis failed: {e}")
+
+    return result
+
+
+def _remove_if_cancelled(future: Future, file_path: str) -> None:
+    # A job cancelled before it started never reaches _pre_analyze, so its copy is removed here
+    if future.cancelled():
+        os.remove(file_path)
+
+
+def start_pre_analysis(data: bytes, file_name: str, temp_dir: str = "temp_uploads") -> str:
+    """
+    Starts the background pre-analysis for an uploaded file (no-op if it is already known).
+    Returns the file hash under which the result can be fetched later.
+    """
+    digest = file_hash(data)
+
+    with _lock:
+        _last_used[digest] = time.time()
+        if digest in _results:
+            _results.move_to_end(digest)
+            return digest
+
+    # Write outside the lock, to a unique file so a concurrent upload (same name or same content)
+    # can't truncate it mid-read. _pre_analyze removes it once the text is extracted.
+    os.makedirs(temp_dir, exist_ok=True)
+    ext = os.path.splitext(file_name)[1].lower()
+    file_path = os.path.join(temp_dir, f"{digest}.{time.time_ns()}{ext}")
+    with open(file_path, "wb") as f:
+        f.write(data)
+
+    with _lock:
+        # Another session may have started the same file while we were writing
+        already_started = digest in _results
+        if already_started:
+            _results.move_to_end(digest)
+        else:
+            future = _executor.submit(_pre_analyze, file_path)
+            future.add_done_callback(lambda f: _remove_if_cancelled(f, file_path))
+            _results[digest] = future
+            # Only drop finished or still-queued (cancellable) jobs; running jobs have already spent the LLM call
+            for evicted in list(_results):
+                if len(_results) <= MAX_CACHED_RESULTS:
+                    break
+                evicted_future = _results[evicted]
+                if evicted_future.done() or evicted_future.cancel():
+                    del _results[evicted]
+                    _last_used.pop(evicted, None)
+
+    if already_started:
+        os.remove(file_path)
+
+    return digest
+
+
+def get_pre_analysis(digest: str) -> dict:
+    """
+    Returns the pre-analysis result for a file hash, waiting only if the job is already running.
+    Returns an empty dict if nothing was started, the job was still queued, the background run
+    failed or its blobs were evicted, in which case the graph simply runs from cold.
+    """
+    with _lock:
+        future = _results.get(digest)
+        if future is None:
+            return {}
+
+        if future.cancel():
+            # Still queued behind other sessions' jobs; running cold is faster than waiting
+            del _results[digest]
+            _last_used.pop(digest, None)
+            return {}
+
+        _last_used[digest] = time.time()
+
+    try:
+        result = future.result()
+    except Exception as e:
+        print(f"Speculative pre-analysis failed: {e}")
+        result = None
+
+    # Touching the blobs while handing them out keeps them alive for the graph run
+    if result is None or not all(touch(ref) for ref in result.values()):
+        # Failed, or its blobs were evicted in the meantime
+        with _lock:
+            if _results.get(digest) is future:
+                del _results[digest]
+                _last_used.pop(digest, None)
+        return {}
+
+    return result
+
+
+def live_refs() -> set:
+    """Returns the blob references held by finished, successful pre-analysis results."""
+    with _lock:
+        futures = list(_results.values())
+
+    refs = set()
+    for future in futures:
+        if future.done() and not future.cancelled() and future.exception() is None:
+            refs.update(future.result().values())
+    return refs
+
+
+def evict_idle(max_idle_seconds: float) -> int:
+    """Drops finished pre-analysis results not used for `max_idle_seconds`. Returns the count removed."""
+    cutoff = time.time() - max_idle_seconds
+    with _lock:
+        idle = [
+            digest for digest, future in _results.items()
+            if future.done() and _last_used.get(digest, 0) < cutoff
+        ]
+        for digest in idle:
+            del _results[digest]
+            _last_used.pop(digest, None)
+
+    return len(idle)